@@ -1,6 +1,11 @@
+import html
+from urllib.parse import urlencode
+
 import requests
 import streamlit as st
 import warnings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 warnings.filterwarnings("ignore")
 
@@ -10,6 +15,7 @@ warnings.filterwarnings("ignore")
 
 API_BASE = "https://movie-recommendation-system-wh20.onrender.com" or "http://127.0.0.1:8000"
 TMDB_IMG = "https://image.tmdb.org/t/p/w500"
+TMDB_IMG_BASE = "https://image.tmdb.org/t/p"
 
 st.set_page_config(
     page_title="Movie Recommender",
@@ -29,6 +35,17 @@ st.markdown(
     max-width: 1400px;
 }
 
+/* Grid */
+.poster-grid {
+    display: grid;
+    gap: 16px;
+}
+
+.poster-grid a.card {
+    color: inherit;
+    text-decoration: none;
+}
+
 /* Poster */
 .poster-wrapper {
     width: 100%;
@@ -49,6 +66,14 @@ st.markdown(
     object-fit: cover;
 }
 
+.poster-wrapper.no-poster {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 0.85rem;
+    color: #9ca3af;
+}
+
 
 /* Title */
 .movie-title {
@@ -83,28 +108,70 @@ if "view" not in st.session_state:
 if "selected_tmdb_id" not in st.session_state:
     st.session_state.selected_tmdb_id = None
 
+HOME_CATEGORIES = ["trending", "popular", "top_rated", "now_playing", "upcoming"]
+
+# poster grid cards are plain links that reload the page into a new session:
+# ?view=details&tmdb_id=...&cols=...&category=...&q=...
+_qp = st.query_params
+_qp_id = _qp.get("tmdb_id")
+if _qp.get("view") == "details" and _qp_id and _qp_id.isdigit():
+    st.session_state.view = "details"
+    st.session_state.selected_tmdb_id = int(_qp_id)
+
+# sidebar/search state survives that reload through the same query params
+if "grid_cols" not in st.session_state:
+    _cols = _qp.get("cols", "")
+    _cols = int(_cols) if _cols.isdigit() else 6
+    st.session_state.grid_cols = _cols if 4 <= _cols <= 8 else 6
+if "home_category" not in st.session_state:
+    _cat = _qp.get("category")
+    st.session_state.home_category = _cat if _cat in HOME_CATEGORIES else "trending"
+if "search_query" not in st.session_state:
+    st.session_state.search_query = _qp.get("q", "")
+# the search box is not rendered on the details view; re-assigning its key
+# keeps streamlit from dropping the value while it is off-screen
+st.session_state.search_query = st.session_state.search_query
+
+
+def nav_params() -> dict:
+    return {
+        "cols": st.session_state.grid_cols,
+        "category": st.session_state.home_category,
+        "q": st.session_state.search_query,
+    }
+
 # =============================
 # NAVIGATION
 # =============================
 def goto_home():
     st.session_state.view = "home"
     st.session_state.selected_tmdb_id = None
-    st.rerun()
-
-
-def goto_details(tmdb_id: int):
-    st.session_state.view = "details"
-    st.session_state.selected_tmdb_id = int(tmdb_id)
+    st.query_params.from_dict(nav_params())
     st.rerun()
 
 
 # =============================
 # API HELPER
 # =============================
+@st.cache_resource(show_spinner=False)
+def api_session():
+    # pooled keep-alive connections to the backend, shared across reruns
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        # not 502: the API uses it for TMDB errors (404s, rate limits), not outages
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
 @st.cache_data(ttl=120, show_spinner=False)
 def api_get_json(path: str, params=None):
     try:
-        r = requests.get(f"{API_BASE}{path}", params=params, timeout=25)
+        r = api_session().get(f"{API_BASE}{path}", params=params, timeout=25)
         if r.status_code >= 400:
             return None
         return r.json()
@@ -114,65 +181,55 @@ def api_get_json(path: str, params=None):
 # =============================
 # UI HELPERS
 # =============================
-def poster_grid(cards, cols=6, key_prefix="grid"):
+def poster_card_html(m, cols: int, nav: str) -> str:
+    tmdb_id = m.get("tmdb_id")
+    title = html.escape(m.get("title") or "Untitled", quote=True)
+    path = m.get("poster_path")
+    poster = m.get("poster_url")
+
+    # grid thumbnails: w185 by default, larger sizes only when the layout needs them
+    lazy = 'loading="lazy" decoding="async" fetchpriority="low"'
+    if path:
+        path = html.escape(path, quote=True)
+        img = (
+            f'<div class="poster-wrapper"><img {lazy} '
+            f'src="{TMDB_IMG_BASE}/w185{path}" '
+            f'srcset="{TMDB_IMG_BASE}/w185{path} 185w, '
+            f"{TMDB_IMG_BASE}/w342{path} 342w, "
+            f'{TMDB_IMG_BASE}/w500{path} 500w" '
+            f'sizes="(max-width: 1400px) {100 // cols}vw, {1400 // cols}px" />'
+            f"</div>"
+        )
+    elif poster:
+        img = (
+            f'<div class="poster-wrapper">'
+            f'<img {lazy} src="{html.escape(poster, quote=True)}" />'
+            f"</div>"
+        )
+    else:
+        img = '<div class="poster-wrapper no-poster">No poster</div>'
+
+    body = f"{img}<div class='movie-title' title='{title}'>{title}</div>"
+
+    if tmdb_id:
+        href = html.escape(f"?view=details&tmdb_id={int(tmdb_id)}&{nav}", quote=True)
+        return f'<a class="card" target="_self" href="{href}">{body}</a>'
+    return f'<div class="card">{body}</div>'
+
+
+def poster_grid(cards, cols=6):
     if not cards:
         st.info("No movies found.")
         return
 
-    rows = (len(cards) + cols - 1) // cols
-    idx = 0
-
-    for _ in range(rows):
-        colset = st.columns(cols, gap="medium")
-        for col in colset:
-            if idx >= len(cards):
-                return
-
-            m = cards[idx]
-            idx += 1
-
-            tmdb_id = m.get("tmdb_id")
-            title = m.get("title", "Untitled")
-            poster = m.get("poster_url")
-
-            with col:
-                st.markdown("<div class='card'>", unsafe_allow_html=True)
-
-                if poster:
-                    st.markdown(
-                        f"""
-                        <div class="poster-wrapper">
-                            <img src="{poster}" />
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.markdown(
-                        """
-                        <div class="poster-wrapper"
-                             style="display:flex;align-items:center;justify-content:center;
-                                    font-size:0.85rem;color:#9ca3af;">
-                            No poster
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
-
-                st.markdown(
-                    f"<div class='movie-title' title='{title}'>{title}</div>",
-                    unsafe_allow_html=True,
-                )
-
-                if tmdb_id:
-                    if st.button(
-                        "View details",
-                        key=f"{key_prefix}_{tmdb_id}",
-                        use_container_width=True,
-                    ):
-                        goto_details(tmdb_id)
-
-                st.markdown("</div>", unsafe_allow_html=True)
+    # the whole grid is a single markdown element (no per-card widgets)
+    nav = urlencode(nav_params())
+    st.markdown(
+        f'<div class="poster-grid" style="grid-template-columns: repeat({cols}, 1fr);">'
+        + "".join(poster_card_html(m, cols, nav) for m in cards)
+        + "</div>",
+        unsafe_allow_html=True,
+    )
 
 def tfidf_cards(items):
     out = []
@@ -184,6 +241,7 @@ def tfidf_cards(items):
                     "tmdb_id": tmdb["tmdb_id"],
                     "title": tmdb.get("title"),
                     "poster_url": tmdb.get("poster_url"),
+                    "poster_path": tmdb.get("poster_path"),
                 }
             )
     return out
@@ -199,12 +257,9 @@ with st.sidebar:
 
     st.markdown("---")
 
-    home_category = st.selectbox(
-        "Home Category",
-        ["trending", "popular", "top_rated", "now_playing", "upcoming"],
-    )
+    home_category = st.selectbox("Home Category", HOME_CATEGORIES, key="home_category")
 
-    grid_cols = st.slider("Grid Columns", 4, 8, 6)
+    grid_cols = st.slider("Grid Columns", 4, 8, key="grid_cols")
 
 # =============================
 # HEADER
@@ -220,20 +275,19 @@ st.divider()
 # HOME VIEW
 # ==========================================================
 if st.session_state.view == "home":
-    query = st.text_input("🔍 Search movies", placeholder="Avengers, Batman, Love…")
+    query = st.text_input(
+        "🔍 Search movies",
+        placeholder="Avengers, Batman, Love…",
+        key="search_query",
+    )
 
     if query.strip():
-        data = api_get_json("/tmdb/search", {"query": query.strip()})
+        data = api_get_json("/tmdb/search", {"query": query.strip(), "limit": 24})
 
         if not data:
             st.error("Search failed.")
         else:
-            results = sorted(
-                data.get("results", []),
-                key=lambda x: x.get("popularity", 0),
-                reverse=True,
-            )
-
+            # already sorted by popularity and truncated server-side
             cards = [
                 {
                     "tmdb_id": m["id"],
@@ -241,17 +295,18 @@ if st.session_state.view == "home":
                     "poster_url": f"{TMDB_IMG}{m['poster_path']}"
                     if m.get("poster_path")
                     else None,
+                    "poster_path": m.get("poster_path"),
                 }
-                for m in results[:24]
+                for m in data.get("results", [])
             ]
 
             st.markdown("### 🔎 Results")
-            poster_grid(cards, cols=grid_cols, key_prefix="search")
+            poster_grid(cards, cols=grid_cols)
 
     else:
         st.markdown(f"### {home_category.replace('_',' ').title()} Movies")
         home_cards = api_get_json("/home", {"category": home_category, "limit": 24})
-        poster_grid(home_cards or [], cols=grid_cols, key_prefix="home")
+        poster_grid(home_cards or [], cols=grid_cols)
 
 # ==========================================================
 # DETAILS VIEW
@@ -262,7 +317,12 @@ elif st.session_state.view == "details":
     if st.button("← Back to Home"):
         goto_home()
 
-    data = api_get_json(f"/movie/id/{tmdb_id}")
+    # details + both recommendation lists in one round trip
+    bundle = api_get_json(
+        f"/bundle/id/{tmdb_id}",
+        {"tfidf_top_n": 12, "genre_limit": 12},
+    )
+    data = (bundle or {}).get("movie_details")
     if not data:
         st.error("Failed to load movie.")
         st.stop()
@@ -274,7 +334,7 @@ elif st.session_state.view == "details":
         st.markdown(
             f"""
             <div class="poster-wrapper">
-                <img src="{data.get('poster_url')}" />
+                <img decoding="async" src="{data.get('poster_url')}" />
             </div>
             """,
             unsafe_allow_html=True,
@@ -300,26 +360,15 @@ elif st.session_state.view == "details":
     st.divider()
     st.markdown("### ✅ Recommendations")
 
-    bundle = api_get_json(
-        "/movie/search",
-        {
-            "query": data.get("title"),
-            "tfidf_top_n": 12,
-            "genre_limit": 12,
-        },
-    )
-
     if bundle:
         st.markdown("#### 🔎 Similar Movies")
         poster_grid(
             tfidf_cards(bundle.get("tfidf_recommendations")),
             cols=grid_cols,
-            key_prefix="tfidf",
         )
 
         st.markdown("#### 🎭 More Like This")
         poster_grid(
             bundle.get("genre_recommendations"),
             cols=grid_cols,
-            key_prefix="genre",
         )
@@ -1,15 +1,26 @@
 import os
+import json
 import pickle
+import shutil
+import asyncio
+import bisect
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Tuple
-from difflib import get_close_matches
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import httpx
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from rapidfuzz import process, fuzz
+from sklearn.preprocessing import normalize
 
 # =========================
 # ENV
@@ -20,13 +31,28 @@ TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE = "https://api.themoviedb.org/3"
 TMDB_IMG_500 = "https://image.tmdb.org/t/p/w500"
 
+TMDB_CACHE_MAXSIZE = 4096
+TMDB_CACHE_TTL = 600
+TMDB_LIST_CACHE_TTL = 3600
+TMDB_LIST_PATHS = {
+    "/trending/movie/day",
+    "/movie/popular",
+    "/movie/top_rated",
+    "/movie/now_playing",
+    "/movie/upcoming",
+}
+
 if not TMDB_API_KEY:
     raise RuntimeError("TMDB_API_KEY missing. Put it in .env as TMDB_API_KEY=xxxx")
 
 # =========================
 # FASTAPI APP
 # =========================
-app = FastAPI(title="Movie Recommender API", version="3.1")
+app = FastAPI(
+    title="Movie Recommender API",
+    version="3.1",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +62,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # =========================
 # PICKLE GLOBALS
 # =========================
@@ -45,10 +73,29 @@ DF_PATH = os.path.join(BASE_DIR, "df.pkl")
 INDICES_PATH = os.path.join(BASE_DIR, "indices.pkl")
 TFIDF_MATRIX_PATH = os.path.join(BASE_DIR, "tfidf_matrix.pkl")
 TFIDF_PATH = os.path.join(BASE_DIR, "tfidf.pkl")
+METADATA_PATH = os.path.join(BASE_DIR, "movies_metadata.csv")
+
+# memory-mappable artifacts derived from the pickles, rebuilt whenever the
+# source stamp stored inside them no longer matches the source files
+MOVIES_DIR = os.path.join(BASE_DIR, "movies")
+TFIDF_CSR_DIR = os.path.join(BASE_DIR, "tfidf_csr")
+TITLE_INDEX_DIR = os.path.join(BASE_DIR, "title_index")
+CSR_PARTS = ("data", "indices", "indptr")
+STAMP_NAME = "source.stamp"
+ARTIFACT_FORMAT = 2  # bump when an artifact's on-disk layout changes
+METADATA_COLUMNS = ["tmdb_id", "poster_path", "release_date"]
+DF_COLUMNS = ["title"] + METADATA_COLUMNS  # only what the request path reads
 
 df: Optional[pd.DataFrame] = None
+TITLES: Optional[np.ndarray] = None
+TMDB_IDS: Optional[np.ndarray] = None
+POSTER_PATHS: Optional[np.ndarray] = None
+RELEASE_DATES: Optional[np.ndarray] = None
 tfidf_matrix: Any = None
-TITLE_TO_IDX: Optional[Dict[str, int]] = None
+# sorted normalized titles + parallel row indices (binary-searched)
+TITLE_KEYS: Optional[List[str]] = None
+TITLE_IDXS: Optional[np.ndarray] = None
+TMDB_ID_TO_IDX: Optional[Dict[int, int]] = None
 
 # =========================
 # MODELS
@@ -57,6 +104,7 @@ class TMDBMovieCard(BaseModel):
     tmdb_id: int
     title: str
     poster_url: Optional[str] = None
+    poster_path: Optional[str] = None
     release_date: Optional[str] = None
     vote_average: Optional[float] = None
 
@@ -67,6 +115,7 @@ class TMDBMovieDetails(BaseModel):
     overview: Optional[str] = None
     release_date: Optional[str] = None
     poster_url: Optional[str] = None
+    poster_path: Optional[str] = None
     backdrop_url: Optional[str] = None
     genres: List[dict] = Field(default_factory=list)
 
@@ -90,37 +139,63 @@ def _norm_title(t: str) -> str:
     return str(t).strip().lower()
 
 
+# incoming titles repeat a lot; the startup keys go through the uncached version
+_norm_query = lru_cache(maxsize=8192)(_norm_title)
+
+
 def make_img_url(path: Optional[str]) -> Optional[str]:
     return f"{TMDB_IMG_500}{path}" if path else None
 
 
+# in-process TTL + LRU cache of successful TMDB responses
+_tmdb_cache: "OrderedDict[Tuple[str, Tuple], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _tmdb_cache_ttl(path: str) -> int:
+    # home lists barely move; searches/details/discover get the shorter TTL
+    return TMDB_LIST_CACHE_TTL if path in TMDB_LIST_PATHS else TMDB_CACHE_TTL
+
+
 async def tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    key = (path, tuple(sorted(params.items())))
+    hit = _tmdb_cache.get(key)
+    if hit and hit[0] > time.monotonic():
+        _tmdb_cache.move_to_end(key)
+        return hit[1]
+
     q = dict(params)
     q["api_key"] = TMDB_API_KEY
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(f"{TMDB_BASE}{path}", params=q)
+    r = await app.state.tmdb.get(path, params=q)
 
     if r.status_code != 200:
         raise HTTPException(status_code=502, detail=f"TMDB error {r.status_code}")
 
-    return r.json()
+    data = r.json()
+    _tmdb_cache[key] = (time.monotonic() + _tmdb_cache_ttl(path), data)
+    _tmdb_cache.move_to_end(key)
+    if len(_tmdb_cache) > TMDB_CACHE_MAXSIZE:
+        _tmdb_cache.popitem(last=False)
+    return data
 
 
 # =========================
 # TMDB HELPERS
 # =========================
+def tmdb_card_from_result(m: dict) -> TMDBMovieCard:
+    # TMDB JSON is trusted: skip pydantic validation on these hot, repeated builds
+    return TMDBMovieCard.model_construct(
+        tmdb_id=int(m["id"]),
+        title=m.get("title") or "",
+        poster_url=make_img_url(m.get("poster_path")),
+        poster_path=m.get("poster_path"),
+        release_date=m.get("release_date"),
+        vote_average=m.get("vote_average"),
+    )
+
+
 async def tmdb_cards_from_results(results: List[dict], limit: int):
-    return [
-        TMDBMovieCard(
-            tmdb_id=int(m["id"]),
-            title=m.get("title") or "",
-            poster_url=make_img_url(m.get("poster_path")),
-            release_date=m.get("release_date"),
-            vote_average=m.get("vote_average"),
-        )
-        for m in (results or [])[:limit]
-    ]
+    return [tmdb_card_from_result(m) for m in (results or [])[:limit]]
 
 
 async def tmdb_movie_details(movie_id: int) -> TMDBMovieDetails:
@@ -131,6 +206,7 @@ async def tmdb_movie_details(movie_id: int) -> TMDBMovieDetails:
         overview=data.get("overview"),
         release_date=data.get("release_date"),
         poster_url=make_img_url(data.get("poster_path")),
+        poster_path=data.get("poster_path"),
         backdrop_url=make_img_url(data.get("backdrop_path")),
         genres=data.get("genres", []),
     )
@@ -151,75 +227,341 @@ def build_title_to_idx_map(indices: Any) -> Dict[str, int]:
     return {_norm_title(k): int(v) for k, v in indices.items()}
 
 
+def lookup_title_idx(key: str) -> Optional[int]:
+    pos = bisect.bisect_left(TITLE_KEYS, key)
+    if pos < len(TITLE_KEYS) and TITLE_KEYS[pos] == key:
+        return int(TITLE_IDXS[pos])
+    return None
+
+
 def get_best_local_title(title: str) -> Optional[str]:
-    matches = get_close_matches(
-        _norm_title(title),
-        TITLE_TO_IDX.keys(),
-        n=1,
-        cutoff=0.6,
+    hit = process.extractOne(
+        _norm_query(title),
+        TITLE_KEYS,
+        scorer=fuzz.ratio,
+        score_cutoff=60,
     )
-    return matches[0] if matches else None
+    return hit[0] if hit else None
 
 
 def get_local_idx_by_title(title: str) -> int:
-    key = _norm_title(title)
-    if key in TITLE_TO_IDX:
-        return TITLE_TO_IDX[key]
+    idx = lookup_title_idx(_norm_query(title))
+    if idx is not None:
+        return idx
 
     fuzzy = get_best_local_title(title)
     if fuzzy:
-        return TITLE_TO_IDX[fuzzy]
+        return lookup_title_idx(fuzzy)
 
     raise HTTPException(status_code=404, detail="Title not in dataset")
 
 
 def tfidf_recommend_titles(title: str, top_n: int):
-    idx = get_local_idx_by_title(title)
+    return tfidf_recommend_idx(get_local_idx_by_title(title), top_n)
+
+
+def tfidf_recommend_idx(idx: int, top_n: int):
     qv = tfidf_matrix[idx]
-    scores = (tfidf_matrix @ qv.T).toarray().ravel()
-    order = np.argsort(-scores)
+    # TF-IDF weights are >= 0, so any row absent from the sparse product
+    # scores exactly 0 and can never outrank a row sharing a term with the query
+    scores = (tfidf_matrix @ qv.T).tocoo()
+    rows, vals = scores.row, scores.data
+
+    # only the top_n + 1 best rows can make it (the +1 covers the query itself)
+    k = min(top_n + 1, vals.size)
+    if k <= 0:
+        return []
+    cand = np.argpartition(vals, -k)[-k:] if k < vals.size else np.arange(vals.size)
+    order = cand[np.argsort(-vals[cand])]
 
     out = []
-    for i in order:
+    for j in order:
+        i = rows[j]
         if i == idx:
             continue
-        out.append((df.iloc[i]["title"], float(scores[i])))
+        out.append(
+            (TITLES[i], float(vals[j]), TMDB_IDS[i], POSTER_PATHS[i], RELEASE_DATES[i])
+        )
         if len(out) >= top_n:
             break
     return out
 
 
-async def attach_tmdb_card_by_title(title: str):
+async def tfidf_recommend_safe(recommend, *args):
+    # off the event loop, so it overlaps with the TMDB calls in flight
     try:
-        m = await tmdb_search_first(title)
-        if not m:
-            return None
-        return TMDBMovieCard(
-            tmdb_id=m["id"],
-            title=m.get("title"),
-            poster_url=make_img_url(m.get("poster_path")),
-            release_date=m.get("release_date"),
-            vote_average=m.get("vote_average"),
-        )
+        return await asyncio.to_thread(recommend, *args)
     except Exception:
+        return []
+
+
+def local_tmdb_card(tmdb_id, title, poster_path, release_date):
+    if tmdb_id is None:
         return None
+    return tmdb_card_from_result(
+        {
+            "id": tmdb_id,
+            "title": title,
+            "poster_path": poster_path,
+            "release_date": release_date,
+        }
+    )
+
+
+async def tmdb_genre_recommendations(genres: List[dict], limit: int):
+    if not genres:
+        return []
+    d = await tmdb_get(
+        "/discover/movie",
+        {"with_genres": genres[0]["id"], "sort_by": "popularity.desc"},
+    )
+    return await tmdb_cards_from_results(d.get("results", []), limit)
+
+
+async def build_bundle(
+    query: str,
+    details: TMDBMovieDetails,
+    recs: list,
+    tfidf_top_n: int,
+    genre_limit: int,
+) -> SearchBundleResponse:
+    # rec cards come from the local TMDB columns, no per-title TMDB search
+    tfidf_items = [
+        TFIDFRecItem.model_construct(
+            title=t, score=s, tmdb=local_tmdb_card(tid, t, p, d)
+        )
+        for t, s, tid, p, d in recs
+    ]
+    genre_recs = await tmdb_genre_recommendations(details.genres, genre_limit)
+
+    # 🔥 GUARANTEED FALLBACK
+    if not tfidf_items and genre_recs:
+        tfidf_items = [
+            TFIDFRecItem.model_construct(title=c.title, score=0.0, tmdb=c)
+            for c in genre_recs[:tfidf_top_n]
+        ]
+
+    return SearchBundleResponse(
+        query=query,
+        movie_details=details,
+        tfidf_recommendations=tfidf_items,
+        genre_recommendations=genre_recs,
+    )
 
 
 # =========================
 # STARTUP
 # =========================
+def _source_stamp(sources: List[str]) -> str:
+    return json.dumps(
+        {
+            "format": ARTIFACT_FORMAT,
+            "sources": {
+                os.path.basename(p): [os.path.getsize(p), os.stat(p).st_mtime_ns]
+                for p in sources
+            },
+        },
+        sort_keys=True,
+    )
+
+
+def _is_fresh(dest: str, sources: List[str]) -> bool:
+    try:
+        with open(os.path.join(dest, STAMP_NAME), encoding="utf-8") as f:
+            return f.read() == _source_stamp(sources)
+    except OSError:
+        return False
+
+
+def _publish(write, dest: str, sources: List[str]) -> bool:
+    # build in a temp dir, stamp it with its sources, then rename it into place:
+    # concurrently starting workers never see a half-written artifact, and a
+    # read-only deploy just skips the cache
+    tmp = f"{dest}.tmp{os.getpid()}"
+    try:
+        os.makedirs(tmp)
+        write(tmp)
+        with open(os.path.join(tmp, STAMP_NAME), "w", encoding="utf-8") as f:
+            f.write(_source_stamp(sources))
+        if os.path.isdir(dest):
+            stale = f"{dest}.stale{os.getpid()}"
+            os.replace(dest, stale)
+            shutil.rmtree(stale, ignore_errors=True)
+        os.replace(tmp, dest)
+        return True
+    except OSError:
+        return _is_fresh(dest, sources)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _save_csr(m: sp.csr_matrix, path: str):
+    for part in CSR_PARTS:
+        np.save(os.path.join(path, f"{part}.npy"), getattr(m, part))
+    np.save(os.path.join(path, "shape.npy"), np.array(m.shape))
+
+
+def load_tfidf_matrix():
+    # float32 CSR with L2-normalized rows: cosine similarity is then a plain SpMV.
+    # The CSR arrays are memory-mapped, so workers share one read-only copy.
+    sources = [TFIDF_MATRIX_PATH]
+    if not _is_fresh(TFIDF_CSR_DIR, sources):
+        with open(TFIDF_MATRIX_PATH, "rb") as f:
+            m = sp.csr_matrix(pickle.load(f), dtype=np.float32)
+        m = normalize(m, norm="l2", copy=False)
+        if not _publish(lambda p: _save_csr(m, p), TFIDF_CSR_DIR, sources):
+            return m
+
+    parts = [
+        np.load(os.path.join(TFIDF_CSR_DIR, f"{part}.npy"), mmap_mode="r")
+        for part in CSR_PARTS
+    ]
+    shape = tuple(np.load(os.path.join(TFIDF_CSR_DIR, "shape.npy")))
+    return sp.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+def attach_metadata(titles: pd.DataFrame) -> pd.DataFrame:
+    # df.pkl is movies_metadata.csv in order, minus untitled and duplicate rows,
+    # so walking both title columns in step recovers each row's TMDB fields
+    meta = pd.read_csv(
+        METADATA_PATH,
+        usecols=["id", "title", "poster_path", "release_date"],
+        dtype=str,
+    )
+    meta = meta[meta["title"].notna()]
+    meta_titles = meta["title"].to_numpy()
+
+    pos = np.full(len(titles), -1)
+    j = 0
+    for i, t in enumerate(titles["title"].to_numpy()):
+        start = j
+        while j < len(meta_titles) and meta_titles[j] != t:
+            j += 1
+        if j == len(meta_titles):
+            # no match ahead: skip just this row and resume where we were
+            j = start
+            continue
+        pos[i] = j
+        j += 1
+
+    hit = pos >= 0
+    if not hit.all():
+        missing = titles["title"].to_numpy()[~hit]
+        raise RuntimeError(
+            f"{len(missing)} df rows have no match in {os.path.basename(METADATA_PATH)}"
+            f" (first: {missing[0]!r})"
+        )
+    out = titles.copy()
+    ids = np.full(len(titles), np.nan)
+    ids[hit] = pd.to_numeric(meta["id"], errors="coerce").to_numpy()[pos[hit]]
+    out["tmdb_id"] = pd.Series(ids).astype("Int64")
+    for col in ("poster_path", "release_date"):
+        vals = np.full(len(titles), None, dtype=object)
+        vals[hit] = meta[col].to_numpy()[pos[hit]]
+        out[col] = vals
+    return out
+
+
+def _column(name: str) -> np.ndarray:
+    # plain ndarray for O(1) row access, with None for missing values
+    col = df[name]
+    return col.astype(object).where(col.notna(), None).to_numpy()
+
+
+def _save_title_index(title_to_idx: Dict[str, int], path: str):
+    keys = sorted(title_to_idx)
+    # JSON, not newline-joined text: titles may contain line breaks
+    with open(os.path.join(path, "keys.json"), "w", encoding="utf-8") as f:
+        json.dump(keys, f, ensure_ascii=False)
+    np.save(
+        os.path.join(path, "idxs.npy"),
+        np.array([title_to_idx[k] for k in keys], dtype=np.int32),
+    )
+
+
+def load_title_index():
+    # normalization and sorting happen once; later starts just read the keys
+    sources = [INDICES_PATH]
+    if not _is_fresh(TITLE_INDEX_DIR, sources):
+        with open(INDICES_PATH, "rb") as f:
+            title_to_idx = build_title_to_idx_map(pickle.load(f))
+        if not _publish(
+            lambda p: _save_title_index(title_to_idx, p), TITLE_INDEX_DIR, sources
+        ):
+            keys = sorted(title_to_idx)
+            return keys, np.array([title_to_idx[k] for k in keys], dtype=np.int32)
+
+    with open(os.path.join(TITLE_INDEX_DIR, "keys.json"), encoding="utf-8") as f:
+        keys = json.load(f)
+    idxs = np.load(os.path.join(TITLE_INDEX_DIR, "idxs.npy"), mmap_mode="r")
+    if len(keys) != len(idxs):
+        raise RuntimeError(
+            f"title index has {len(keys)} keys but {len(idxs)} row indices"
+        )
+    return keys, idxs
+
+
+def _save_movies(slim: pd.DataFrame, path: str):
+    slim.to_parquet(os.path.join(path, "movies.parquet"), index=False)
+
+
+def load_df():
+    sources = [DF_PATH, METADATA_PATH]
+    if not _is_fresh(MOVIES_DIR, sources):
+        with open(DF_PATH, "rb") as f:
+            slim = attach_metadata(pickle.load(f)[["title"]])
+        if not _publish(lambda p: _save_movies(slim, p), MOVIES_DIR, sources):
+            return slim
+
+    return pd.read_parquet(
+        os.path.join(MOVIES_DIR, "movies.parquet"),
+        columns=DF_COLUMNS,
+        memory_map=True,
+    )
+
+
 @app.on_event("startup")
 def load_pickles():
-    global df, tfidf_matrix, TITLE_TO_IDX
+    global df, TITLES, TMDB_IDS, POSTER_PATHS, RELEASE_DATES
+    global tfidf_matrix, TITLE_KEYS, TITLE_IDXS, TMDB_ID_TO_IDX
+
+    df = load_df()
+    TITLES = df["title"].to_numpy()
+    TMDB_IDS = _column("tmdb_id")
+    POSTER_PATHS = _column("poster_path")
+    RELEASE_DATES = _column("release_date")
+    TMDB_ID_TO_IDX = {}
+    for i, tid in enumerate(TMDB_IDS):
+        if tid is not None:
+            TMDB_ID_TO_IDX.setdefault(tid, i)
+
+    TITLE_KEYS, TITLE_IDXS = load_title_index()
+
+    tfidf_matrix = load_tfidf_matrix()
+
+    # the artifacts are built independently; refuse to serve mismatched rows
+    if tfidf_matrix.shape[0] != len(df):
+        raise RuntimeError(
+            f"tfidf_matrix has {tfidf_matrix.shape[0]} rows but df has {len(df)}"
+        )
+    if len(TITLE_IDXS) and int(np.max(TITLE_IDXS)) >= len(df):
+        raise RuntimeError("title index points past the end of df")
 
-    with open(DF_PATH, "rb") as f:
-        df = pickle.load(f)
 
-    with open(INDICES_PATH, "rb") as f:
-        TITLE_TO_IDX = build_title_to_idx_map(pickle.load(f))
+@app.on_event("startup")
+async def open_tmdb_client():
+    # one pooled keep-alive client for all TMDB calls (no TLS handshake per request)
+    app.state.tmdb = httpx.AsyncClient(
+        base_url=TMDB_BASE,
+        timeout=20,
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+
 
-    with open(TFIDF_MATRIX_PATH, "rb") as f:
-        tfidf_matrix = pickle.load(f)
+@app.on_event("shutdown")
+async def close_tmdb_client():
+    await app.state.tmdb.aclose()
 
 # =========================
 # ROUTES
@@ -234,11 +576,27 @@ async def home(category: str = "popular", limit: int = 24):
 
 
 @app.get("/tmdb/search")
-async def tmdb_search(query: str):
-    return await tmdb_get(
+async def tmdb_search(query: str, limit: int = Query(24, ge=1, le=100)):
+    data = await tmdb_get(
         "/search/movie",
         {"query": query, "language": "en-US", "include_adult": "false"},
     )
+    results = sorted(
+        data.get("results", []),
+        key=lambda m: m.get("popularity") or 0,
+        reverse=True,
+    )
+    return {
+        "results": [
+            {
+                "id": m["id"],
+                "title": m.get("title"),
+                "poster_path": m.get("poster_path"),
+                "popularity": m.get("popularity"),
+            }
+            for m in results[:limit]
+        ]
+    }
 
 
 @app.get("/movie/id/{tmdb_id}", response_model=TMDBMovieDetails)
@@ -247,42 +605,40 @@ async def movie_details_route(tmdb_id: int):
 
 
 @app.get("/movie/search", response_model=SearchBundleResponse)
-async def search_bundle(query: str, tfidf_top_n: int = 12, genre_limit: int = 12):
+async def search_bundle(
+    query: str,
+    tfidf_top_n: int = Query(12, ge=1),
+    genre_limit: int = 12,
+):
     best = await tmdb_search_first(query)
     if not best:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    details = await tmdb_movie_details(best["id"])
-
-    tfidf_items = []
-    try:
-        recs = tfidf_recommend_titles(details.title, tfidf_top_n)
-    except Exception:
-        recs = []
-
-    for t, s in recs:
-        card = await attach_tmdb_card_by_title(t)
-        tfidf_items.append(TFIDFRecItem(title=t, score=s, tmdb=card))
-
-    genre_recs = []
-    if details.genres:
-        gid = details.genres[0]["id"]
-        d = await tmdb_get(
-            "/discover/movie",
-            {"with_genres": gid, "sort_by": "popularity.desc"},
-        )
-        genre_recs = await tmdb_cards_from_results(d.get("results", []), genre_limit)
-
-    # 🔥 GUARANTEED FALLBACK
-    if not tfidf_items and genre_recs:
-        tfidf_items = [
-            TFIDFRecItem(title=c.title, score=0.0, tmdb=c)
-            for c in genre_recs[:tfidf_top_n]
-        ]
-
-    return SearchBundleResponse(
-        query=query,
-        movie_details=details,
-        tfidf_recommendations=tfidf_items,
-        genre_recommendations=genre_recs,
+    details, recs = await asyncio.gather(
+        tmdb_movie_details(best["id"]),
+        tfidf_recommend_safe(
+            tfidf_recommend_titles, best.get("title") or query, tfidf_top_n
+        ),
     )
+    return await build_bundle(query, details, recs, tfidf_top_n, genre_limit)
+
+
+@app.get("/bundle/id/{tmdb_id}", response_model=SearchBundleResponse)
+async def bundle_by_id(
+    tmdb_id: int,
+    tfidf_top_n: int = Query(12, ge=1),
+    genre_limit: int = 12,
+):
+    # same bundle as /movie/search, minus the TMDB title search round trip
+    idx = TMDB_ID_TO_IDX.get(tmdb_id)
+    if idx is not None:
+        details, recs = await asyncio.gather(
+            tmdb_movie_details(tmdb_id),
+            tfidf_recommend_safe(tfidf_recommend_idx, idx, tfidf_top_n),
+        )
+    else:
+        details = await tmdb_movie_details(tmdb_id)
+        recs = await tfidf_recommend_safe(
+            tfidf_recommend_titles, details.title, tfidf_top_n
+        )
+    return await build_bundle(details.title, details, recs, tfidf_top_n, genre_limit)